@@ -4,8 +4,20 @@ import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 import os
+import re
+import gzip
 import json
-from collections import defaultdict
+import time
+import threading
+from contextlib import contextmanager
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 CORS(app)
@@ -31,7 +43,111 @@ SCOPES = [
 ]
 HEADERS = ["Date", "Description", "Category", "Amount", "Account"]
 CATEGORIES = ["Income", "Needs", "Wants"]
-ACCOUNTS = ["Kek", "Nat", "Joint"]
+# Account names end up in expense ids ("<account>_<row>"), so they can't contain "_"
+ACCOUNT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9]{1,40}$")
+
+def get_configured_accounts():
+    """Read account names from the ACCOUNTS environment variable, skipping invalid names"""
+    accounts = []
+    for account in os.getenv("ACCOUNTS", "Kek,Nat,Joint").split(","):
+        account = account.strip()
+        if not account or account.casefold() in (existing.casefold() for existing in accounts):
+            continue
+        if not ACCOUNT_NAME_PATTERN.match(account):
+            print(f"Skipping invalid account name in ACCOUNTS: {account}")
+            continue
+        accounts.append(account)
+    return accounts
+
+# Accounts listed here are always offered; accounts created through the API are
+# found again on startup from their "<account>_Expenses" worksheets
+ACCOUNTS = get_configured_accounts()
+SHEETS_IO_WORKERS = int(os.getenv("SHEETS_IO_WORKERS", 8))
+
+def get_cache_size(name: str, default: int):
+    size = int(os.getenv(name, default))
+    if size < 1:
+        raise ValueError(f"{name} must be at least 1, got {size}")
+    return size
+
+ACCOUNT_CACHE_SIZE = get_cache_size("ACCOUNT_CACHE_SIZE", 32)
+YEAR_SHEET_CACHE_SIZE = get_cache_size("YEAR_SHEET_CACHE_SIZE", 64)
+LEDGER_CACHE_SIZE = get_cache_size("LEDGER_CACHE_SIZE", 16)
+
+# Independent Sheets API calls (different accounts or year sheets) run on this pool
+sheets_executor = ThreadPoolExecutor(max_workers=SHEETS_IO_WORKERS, thread_name_prefix="sheets-io")
+# Serializes edits per account, since year blocks are located by reading the sheet first.
+# Entries are [lock, users] and only exist while a request holds or waits on the lock
+account_locks = {}
+account_locks_guard = threading.Lock()
+# Guards the account list and publishing newly opened account worksheets
+registry_lock = threading.Lock()
+
+@contextmanager
+def account_lock(account: str):
+    with account_locks_guard:
+        # Reentrant so a request holding its account lock can still open the account sheet
+        entry = account_locks.setdefault(account, [threading.RLock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with account_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del account_locks[account]
+
+def run_concurrently(calls):
+    """Run (function, *args) calls on the Sheets I/O pool and return their results in order"""
+    futures = [sheets_executor.submit(function, *args) for function, *args in calls]
+    # Let every call finish before raising, so callers holding an account lock
+    # never release it while sibling writes are still running
+    wait(futures)
+    for future in futures:
+        if future.exception() is not None:
+            raise future.exception()
+    return [future.result() for future in futures]
+
+class LRUCache:
+    """Thread-safe mapping that drops the least recently used entry once max_size is exceeded"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.entries:
+                return default
+            self.entries.move_to_end(key)
+            return self.entries[key]
+    
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def setdefault(self, key, default):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            self.entries[key] = default
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            # Returned directly, since it may already have been evicted
+            return default
+    
+    def pop(self, key, default=None):
+        with self.lock:
+            return self.entries.pop(key, default)
+    
+    def __len__(self):
+        return len(self.entries)
 
 # === Initialize Google Sheets ===
 def init_google_sheets():
@@ -40,28 +156,74 @@ def init_google_sheets():
         client = gspread.authorize(creds)
         spreadsheet = client.open(SPREADSHEET_NAME)
         
-        # Initialize sheets for each account
-        sheets = {}
-        for account in ACCOUNTS:
-            sheet_name = f"{account}_Expenses"
-            try:
-                sheets[account] = spreadsheet.worksheet(sheet_name)
-            except gspread.exceptions.WorksheetNotFound:
-                sheets[account] = spreadsheet.add_worksheet(sheet_name, rows=1000, cols=10)
-                sheets[account].append_row(HEADERS)
+        # One metadata call lists every account; worksheets are opened on first use
+        for worksheet in spreadsheet.worksheets():
+            if worksheet.title.endswith("_Expenses"):
+                account = worksheet.title[:-len("_Expenses")]
+                if not account_exists(account) and ACCOUNT_NAME_PATTERN.match(account):
+                    ACCOUNTS.append(account)
         
-        return spreadsheet, sheets
+        return spreadsheet
     except Exception as e:
         print(f"Error initializing Google Sheets: {str(e)}")
         raise
 
-spreadsheet, account_sheets = init_google_sheets()
-year_sheet_cache = {}
+spreadsheet = init_google_sheets()
+account_sheets = LRUCache(ACCOUNT_CACHE_SIZE)
+year_sheet_cache = LRUCache(YEAR_SHEET_CACHE_SIZE)
+
+def account_exists(account: str):
+    # Sheet names are case-insensitive, so "kek" would clash with "Kek_Expenses"
+    return account.casefold() in (existing.casefold() for existing in ACCOUNTS)
+
+def open_account_sheet(account: str):
+    sheet_name = f"{account}_Expenses"
+    # Held until the header is written, so no one can append above it
+    with account_lock(account):
+        try:
+            return spreadsheet.worksheet(sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            try:
+                sheet = spreadsheet.add_worksheet(sheet_name, rows=1000, cols=10)
+            except gspread.exceptions.APIError as e:
+                if "already exists" in str(e):
+                    raise ValueError(f"Account already exists: {account}")
+                raise
+            sheet.append_row(HEADERS)
+            return sheet
+
+def get_account_sheet(account: str):
+    """Return the raw expenses worksheet for an account, opening or creating it on first use"""
+    sheet = account_sheets.get(account)
+    if sheet is not None:
+        return sheet
+    
+    # Opened outside the registry lock so a slow first use doesn't hold up other accounts
+    sheet = open_account_sheet(account)
+    with registry_lock:
+        cached = account_sheets.get(account)
+        if cached is not None:
+            return cached
+        account_sheets[account] = sheet
+    return sheet
+
+def create_account(account: str):
+    """Register a new account and create its raw expenses worksheet"""
+    if account_exists(account):
+        raise ValueError(f"Account already exists: {account}")
+    
+    sheet = open_account_sheet(account)
+    with registry_lock:
+        if account_exists(account):
+            raise ValueError(f"Account already exists: {account}")
+        account_sheets[account] = sheet
+        ACCOUNTS.append(account)
 
 def get_year_sheet(year_name: str, account: str):
     cache_key = f"{account}_{year_name}"
-    if cache_key in year_sheet_cache:
-        return year_sheet_cache[cache_key]
+    year_sheet = year_sheet_cache.get(cache_key)
+    if year_sheet is not None:
+        return year_sheet
     
     sheet_name = f"{account}_{year_name}"
     try:
@@ -115,7 +277,7 @@ def rebuild_yearly_sheets(account: str):
     print(f"{'='*60}")
     
     # Get all expenses from raw sheet
-    raw_sheet = account_sheets[account]
+    raw_sheet = get_account_sheet(account)
     all_data = raw_sheet.get_all_values()
     
     if len(all_data) <= 1:
@@ -155,171 +317,147 @@ def rebuild_yearly_sheets(account: str):
     
     print(f"Found {len(years)} year(s) with data: {sorted(years)}")
     
-    # Rebuild each year sheet
+    # Plan every month block up front so each previous month's savings cell is
+    # known before anything is written, which lets the year sheets be rebuilt concurrently
+    month_blocks = {}
     for year_name in sorted(years):
-        print(f"\nRebuilding {account}_{year_name}...")
-        
-        # Clear the year sheet cache
-        cache_key = f"{account}_{year_name}"
-        if cache_key in year_sheet_cache:
-            del year_sheet_cache[cache_key]
-        
-        # Get or create year sheet
-        sheet_name = f"{account}_{year_name}"
-        try:
-            year_sheet = spreadsheet.worksheet(sheet_name)
-            # Clear all content
-            year_sheet.clear()
-        except gspread.exceptions.WorksheetNotFound:
-            year_sheet = spreadsheet.add_worksheet(sheet_name, rows=1000, cols=6)
-        
-        apply_initial_formatting(year_sheet)
-        
-        # Build the sheet month by month
-        current_row = 1
-        
+        start_row = 1
         for month in range(1, 13):
             key = (year_name, month)
             if key not in expenses_by_year_month:
                 continue
             
-            month_data = expenses_by_year_month[key]
-            month_name = datetime(int(year_name), month, 1).strftime("%B")
-            
-            print(f"  Adding {month_name}: Income={len(month_data['income'])}, Needs={len(month_data['needs'])}, Wants={len(month_data['wants'])}")
-            
-            # Month header
-            year_sheet.update(f'A{current_row}', [[f"{month_name} {year_name}"]])
-            spreadsheet.batch_update({"requests": [{
-                "mergeCells": {
-                    "range": {
-                        "sheetId": year_sheet.id,
-                        "startRowIndex": current_row - 1,
-                        "endRowIndex": current_row,
-                        "startColumnIndex": 0,
-                        "endColumnIndex": 6
-                    },
-                    "mergeType": "MERGE_ALL"
-                }
-            }]})
-            current_row += 1
-            
-            # Column headers
-            year_sheet.update(f'A{current_row}', [["Date", "Source of income", "Amount", "Date", "Description", "Amount"]])
-            current_row += 1
-            
-            data_start_row = current_row
-            
-            # Add previous month savings for first row (except January)
+            # Add previous month savings for first row
             all_income_rows = []
-            if month > 1:
-                prev_month = month - 1
-                prev_month_name = datetime(int(year_name), prev_month, 1).strftime("%B")
-                # Look for previous month's savings cell
-                prev_savings_cell = f"'{sheet_name}'!C{find_savings_row_for_month(year_sheet, prev_month_name)}"
-                if find_savings_row_for_month(year_sheet, prev_month_name):
+            prev_key = (year_name, month - 1) if month > 1 else (str(int(year_name) - 1), 12)
+            if prev_key in month_blocks:
+                prev_savings_cell = f"'{account}_{prev_key[0]}'!C{month_blocks[prev_key]['layout']['savings']}"
+                all_income_rows.append(["", "FROM Previous month", f"={prev_savings_cell}"])
+            elif month == 1 and prev_key[0] not in years:
+                # Previous year is not being rebuilt, so its sheet can be read as is
+                prev_savings_cell = find_previous_month_savings_cell(year_name, month, account)
+                if prev_savings_cell:
                     all_income_rows.append(["", "FROM Previous month", f"={prev_savings_cell}"])
-            elif month == 1:
-                # Check previous year
-                prev_year = str(int(year_name) - 1)
-                try:
-                    prev_year_sheet = spreadsheet.worksheet(f"{account}_{prev_year}")
-                    # Find December savings
-                    prev_savings_row = find_savings_row_for_month(prev_year_sheet, "December")
-                    if prev_savings_row:
-                        prev_savings_cell = f"'{account}_{prev_year}'!C{prev_savings_row}"
-                        all_income_rows.append(["", "FROM Previous month", f"={prev_savings_cell}"])
-                except:
-                    pass
             
+            month_data = expenses_by_year_month[key]
             all_income_rows.extend(month_data['income'])
             all_expense_rows = month_data['needs'] + month_data['wants']
             
             # Build data rows
             max_rows = max(len(all_income_rows), len(all_expense_rows))
-            new_rows = []
+            data_rows = []
             for i in range(max_rows):
                 row = ["", "", "", "", "", ""]
                 if i < len(all_income_rows):
                     row[0:3] = all_income_rows[i]
                 if i < len(all_expense_rows):
                     row[3:6] = all_expense_rows[i]
-                new_rows.append(row)
-            
-            if new_rows:
-                year_sheet.update(f'A{current_row}', new_rows, value_input_option='USER_ENTERED')
-                current_row += len(new_rows)
-            
-            data_end_row = current_row - 1
-            
-            # Blank row
-            year_sheet.update(f'A{current_row}', [["", "", "", "", "", ""]])
-            current_row += 1
+                data_rows.append(row)
             
-            # Totals
-            totals_formula_income = f"=SUM(C{data_start_row}:C{data_end_row})"
-            totals_formula_expenses = f"=SUM(F{data_start_row}:F{data_end_row})"
-            
-            year_sheet.update(f'A{current_row}', [["", "Total income", totals_formula_income, "", "", ""]], 
-                            value_input_option='USER_ENTERED')
-            current_row += 1
-            
-            # Savings row
-            savings_formula = f"=C{current_row - 1}-F{current_row}"
-            year_sheet.update(f'A{current_row}', [["", "Savings", savings_formula, "", "Total expenses", totals_formula_expenses]], 
-                            value_input_option='USER_ENTERED')
-            current_row += 1
-            
-            # Spacing
-            year_sheet.update(f'A{current_row}', [["", "", "", "", "", ""]])
-            current_row += 1
-            year_sheet.update(f'A{current_row}', [["", "", "", "", "", ""]])
-            current_row += 1
-        
-        print(f"✓ Completed {account}_{year_name}")
+            layout = month_block_layout(start_row, len(data_rows))
+            month_blocks[key] = {"month_data": month_data, "rows": data_rows, "layout": layout}
+            start_row = layout["next_start"]
+    
+    for year_name in years:
+        record_year_savings_rows(account, year_name, {
+            month: block["layout"]["savings"] for (year, month), block in month_blocks.items() if year == year_name
+        })
+    
+    run_concurrently([
+        (rebuild_year_sheet, account, year_name, month_blocks)
+        for year_name in sorted(years)
+    ])
     
     print(f"\n{'='*60}")
     print(f"REBUILD COMPLETE FOR {account}")
     print(f"{'='*60}\n")
 
-def find_savings_row_for_month(year_sheet, month_name):
-    """Find the row number where savings is calculated for a given month"""
-    try:
-        all_values = year_sheet.get_all_values()
-        for i, row in enumerate(all_values):
-            if row and month_name in str(row[0]):
-                # Found month header, look for Savings row below
-                for j in range(i + 1, min(i + 50, len(all_values))):
-                    if all_values[j] and "Savings" in str(all_values[j][1]):
-                        return j + 1  # Return 1-indexed row number
-        return None
-    except:
-        return None
+def month_block_layout(start_row: int, data_row_count: int):
+    """Row numbers of each part of a month block in a yearly sheet, shared by planning and writing"""
+    data_end = start_row + 1 + data_row_count
+    return {
+        "header": start_row,
+        "column_headers": start_row + 1,
+        "data_start": start_row + 2,
+        "data_end": data_end,
+        "blank": data_end + 1,
+        "totals": data_end + 2,
+        "savings": data_end + 3,
+        "spacing": data_end + 4,
+        "next_start": data_end + 6
+    }
 
-def find_previous_month_savings_cell(year_name: str, month: int, account: str):
-    if month == 1:
-        prev_year = str(int(year_name) - 1)
-        prev_month = 12
-        try:
-            prev_year_sheet = spreadsheet.worksheet(f"{account}_{prev_year}")
-            all_values = prev_year_sheet.get_all_values()
-            sheet_name = f"{account}_{prev_year}"
-        except:
-            return None
-    else:
-        prev_month = month - 1
-        year_sheet = get_year_sheet(year_name, account)
-        all_values = year_sheet.get_all_values()
-        sheet_name = f"{account}_{year_name}"
+def rebuild_year_sheet(account: str, year_name: str, month_blocks):
+    """Clear and rewrite a single year sheet, writing each planned month block at its planned rows"""
+    print(f"\nRebuilding {account}_{year_name}...")
     
-    prev_month_name = datetime(2000, prev_month, 1).strftime("%B")
+    # Clear the year sheet cache
+    year_sheet_cache.pop(f"{account}_{year_name}")
     
-    for i, row in enumerate(all_values):
-        if row and prev_month_name in str(row[0]):
-            for j in range(i + 1, min(i + 50, len(all_values))):
-                if all_values[j] and "Savings" in str(all_values[j][1]):
-                    return f"'{sheet_name}'!C{j + 1}"
-    return None
+    # Get or create year sheet
+    sheet_name = f"{account}_{year_name}"
+    try:
+        year_sheet = spreadsheet.worksheet(sheet_name)
+        # Clear all content
+        year_sheet.clear()
+    except gspread.exceptions.WorksheetNotFound:
+        year_sheet = spreadsheet.add_worksheet(sheet_name, rows=1000, cols=6)
+    
+    apply_initial_formatting(year_sheet)
+    
+    # Build the sheet month by month
+    for month in range(1, 13):
+        key = (year_name, month)
+        if key not in month_blocks:
+            continue
+        
+        block = month_blocks[key]
+        month_data = block["month_data"]
+        layout = block["layout"]
+        month_name = datetime(int(year_name), month, 1).strftime("%B")
+        
+        print(f"  Adding {month_name}: Income={len(month_data['income'])}, Needs={len(month_data['needs'])}, Wants={len(month_data['wants'])}")
+        
+        # Month header
+        year_sheet.update(f'A{layout["header"]}', [[f"{month_name} {year_name}"]])
+        spreadsheet.batch_update({"requests": [{
+            "mergeCells": {
+                "range": {
+                    "sheetId": year_sheet.id,
+                    "startRowIndex": layout["header"] - 1,
+                    "endRowIndex": layout["header"],
+                    "startColumnIndex": 0,
+                    "endColumnIndex": 6
+                },
+                "mergeType": "MERGE_ALL"
+            }
+        }]})
+        
+        # Column headers
+        year_sheet.update(f'A{layout["column_headers"]}', [["Date", "Source of income", "Amount", "Date", "Description", "Amount"]])
+        
+        if block["rows"]:
+            year_sheet.update(f'A{layout["data_start"]}', block["rows"], value_input_option='USER_ENTERED')
+        
+        # Blank row
+        year_sheet.update(f'A{layout["blank"]}', [["", "", "", "", "", ""]])
+        
+        # Totals
+        totals_formula_income = f"=SUM(C{layout['data_start']}:C{layout['data_end']})"
+        totals_formula_expenses = f"=SUM(F{layout['data_start']}:F{layout['data_end']})"
+        
+        year_sheet.update(f'A{layout["totals"]}', [["", "Total income", totals_formula_income, "", "", ""]],
+                        value_input_option='USER_ENTERED')
+        
+        # Savings row
+        savings_formula = f"=C{layout['totals']}-F{layout['savings']}"
+        year_sheet.update(f'A{layout["savings"]}', [["", "Savings", savings_formula, "", "Total expenses", totals_formula_expenses]],
+                        value_input_option='USER_ENTERED')
+        
+        # Spacing
+        year_sheet.update(f'A{layout["spacing"]}', [["", "", "", "", "", ""], ["", "", "", "", "", ""]])
+    
+    print(f"✓ Completed {account}_{year_name}")
 
 def append_to_month(year_sheet, month: int, year_name: str, account: str, income_rows, needs_rows, wants_rows):
     """Append rows to a specific month without clearing existing data"""
@@ -334,6 +472,9 @@ def append_to_month(year_sheet, month: int, year_name: str, account: str, income
     
     print(f"DEBUG: Processing {month_name} {year_name} for {account}, found at row: {month_row}")
     
+    # The sheet was just downloaded, so refresh what the chain knows about it for free
+    record_year_savings_rows(account, year_name, scan_savings_rows(all_values))
+    
     if month_row is None:
         last_content_row = 0
         for i in range(len(all_values) - 1, -1, -1):
@@ -342,7 +483,7 @@ def append_to_month(year_sheet, month: int, year_name: str, account: str, income
                 break
         
         last_row = last_content_row + 3 if last_content_row > 0 else 1
-        prev_savings_cell = find_previous_month_savings_cell(year_name, month, account)
+        prev_savings_cell = find_previous_month_savings_cell(year_name, month, account, all_values)
         
         year_sheet.update(f'A{last_row}', [[f"{month_name} {year_name}"]])
         
@@ -400,6 +541,7 @@ def append_to_month(year_sheet, month: int, year_name: str, account: str, income
         savings_formula = f"=C{last_row - 1}-F{last_row}"
         year_sheet.update(f'A{last_row}', [["", "Savings", savings_formula, "", "Total expenses", totals_formula_expenses]], 
                          value_input_option='USER_ENTERED')
+        record_savings_row(account, year_name, month, last_row)
         
         last_row += 1
         year_sheet.update(f'A{last_row}:{last_row + 1}', [["", "", "", "", "", ""], ["", "", "", "", "", ""]])
@@ -430,6 +572,7 @@ def append_to_month(year_sheet, month: int, year_name: str, account: str, income
         
         print(f"DEBUG: Inserting {len(new_rows)} rows at position {insert_row}")
         year_sheet.insert_rows(new_rows, insert_row, value_input_option='USER_ENTERED')
+        shift_savings_rows(account, year_name, insert_row, len(new_rows))
         
         spacing_row = insert_row + len(new_rows)
         totals_row = spacing_row + 1
@@ -447,6 +590,330 @@ def append_to_month(year_sheet, month: int, year_name: str, account: str, income
         year_sheet.update(f'A{total_expenses_row}', [["", "Savings", savings_formula, 
                                                 "", "Total expenses", totals_formula_expenses]], 
                          value_input_option='USER_ENTERED')
+        record_savings_row(account, year_name, month, total_expenses_row)
+
+def append_to_years(account: str, year_names, grouped):
+    """Append grouped month rows to each year sheet in order, months in calendar order"""
+    for year_name in year_names:
+        year_sheet_cache.pop(f"{account}_{year_name}")
+        
+        year_sheet = get_year_sheet(year_name, account)
+        for month in sorted(month for year, month in grouped if year == year_name):
+            data = grouped[(year_name, month)]
+            month_name = datetime(int(year_name), month, 1).strftime("%B")
+            print(f"\nUpdating {month_name} {year_name} for {account}:")
+            print(f"  Income entries: {len(data['income'])}")
+            print(f"  Needs entries: {len(data['needs'])}")
+            print(f"  Wants entries: {len(data['wants'])}")
+            
+            append_to_month(year_sheet, month, year_name, account, data['income'], data['needs'], data['wants'])
+
+# === Balance Chain ===
+MONTH_HEADER_PATTERN = re.compile(r"^(January|February|March|April|May|June|July|August|September|October|November|December) \d{4}$")
+balance_chains = LRUCache(ACCOUNT_CACHE_SIZE)
+
+def get_balance_chain(account: str):
+    """Savings row of every known month block, and when each year sheet was last fully known"""
+    chain = balance_chains.get(account)
+    if chain is None:
+        chain = balance_chains.setdefault(account, {
+            "savings_rows": {},
+            "known_years": {},
+            "lock": threading.Lock()
+        })
+    return chain
+
+def scan_savings_rows(all_values):
+    """Map each month in a year sheet to the 1-indexed row of its Savings cell"""
+    savings_rows = {}
+    month = None
+    for i, row in enumerate(all_values):
+        if not row:
+            continue
+        header = MONTH_HEADER_PATTERN.match(str(row[0]).strip())
+        if header:
+            month = datetime.strptime(header.group(1), "%B").month
+        elif month and len(row) > 1 and "Savings" in str(row[1]):
+            savings_rows[month] = i + 1
+            month = None
+    return savings_rows
+
+def record_year_savings_rows(account: str, year_name: str, month_rows, chain=None):
+    """Replace everything known about one year sheet with a full set of month savings rows"""
+    if chain is None:
+        chain = get_balance_chain(account)
+    with chain["lock"]:
+        for key in [key for key in chain["savings_rows"] if key[0] == year_name]:
+            del chain["savings_rows"][key]
+        for month, row in month_rows.items():
+            chain["savings_rows"][(year_name, month)] = row
+        chain["known_years"][year_name] = time.time()
+
+def record_savings_row(account: str, year_name: str, month: int, row: int):
+    chain = get_balance_chain(account)
+    with chain["lock"]:
+        chain["savings_rows"][(year_name, month)] = row
+
+def shift_savings_rows(account: str, year_name: str, from_row: int, count: int):
+    """Move known savings rows at or below from_row after rows are inserted into a year sheet"""
+    chain = get_balance_chain(account)
+    with chain["lock"]:
+        for key, row in chain["savings_rows"].items():
+            if key[0] == year_name and row >= from_row:
+                chain["savings_rows"][key] = row + count
+
+def find_previous_month_savings_cell(year_name: str, month: int, account: str, all_values=None):
+    """Return the previous month's Savings cell, reading a year sheet only if the chain doesn't know it"""
+    if month == 1:
+        prev_year = str(int(year_name) - 1)
+        prev_month = 12
+    else:
+        prev_year = year_name
+        prev_month = month - 1
+    sheet_name = f"{account}_{prev_year}"
+    
+    chain = get_balance_chain(account)
+    with chain["lock"]:
+        known_at = chain["known_years"].get(prev_year)
+    
+    # Rescan when the year is unknown or old enough that the sheet may have been edited by hand
+    if known_at is None or time.time() - known_at >= LEDGER_CACHE_TTL:
+        # Same-year callers pass the values they already downloaded
+        if month == 1 or all_values is None:
+            try:
+                all_values = spreadsheet.worksheet(sheet_name).get_all_values()
+            except:
+                return None
+        # Recorded into the same chain object read below, even if it was evicted meanwhile
+        record_year_savings_rows(account, prev_year, scan_savings_rows(all_values), chain)
+    
+    with chain["lock"]:
+        prev_savings_row = chain["savings_rows"].get((prev_year, prev_month))
+    if prev_savings_row is None:
+        return None
+    return f"'{sheet_name}'!C{prev_savings_row}"
+
+def compute_balances(ledger):
+    """Monthly totals with the carried-over opening and closing balance, oldest first"""
+    if "balances" in ledger:
+        return ledger["balances"]
+    
+    monthly_data = defaultdict(lambda: {"Income": 0, "Needs": 0, "Wants": 0})
+    for expense, month_key in zip(ledger["expenses"], ledger["months"]):
+        if month_key and expense["category"] in CATEGORIES:
+            monthly_data[month_key][expense["category"]] += expense["amount"]
+    
+    # A month block only carries over from the calendar month right before it,
+    # matching the "FROM Previous month" row written to the yearly sheets
+    balances = []
+    closing_by_month = {}
+    for month_key in sorted(monthly_data):
+        year, month = int(month_key[:4]), int(month_key[5:])
+        prev_key = f"{year}-{month - 1:02d}" if month > 1 else f"{year - 1}-12"
+        opening = closing_by_month.get(prev_key, 0)
+        data = monthly_data[month_key]
+        closing = opening + data["Income"] - data["Needs"] - data["Wants"]
+        closing_by_month[month_key] = closing
+        balances.append({
+            "month": month_key,
+            "opening": opening,
+            "income": data["Income"],
+            "needs": data["Needs"],
+            "wants": data["Wants"],
+            "closing": closing
+        })
+    
+    ledger["balances"] = balances
+    return balances
+
+# === Ledger Cache & Search Index ===
+LEDGER_CACHE_TTL = int(os.getenv("LEDGER_CACHE_TTL", 300))
+# Unicode word characters, so descriptions in any script can be searched
+TOKEN_PATTERN = re.compile(r"\w+")
+ledger_cache = LRUCache(LEDGER_CACHE_SIZE)
+# Bumped on every write; a read only caches its ledger if no write landed meanwhile.
+# A plain dict (one int per account) so an entry can never be evicted mid-read
+ledger_generations = {}
+ledger_lock = threading.Lock()
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).casefold())
+
+def build_ledger(account: str, all_data):
+    """Parse raw sheet values into expense rows; the search index is built on first search"""
+    expenses = []
+    months = []
+    
+    for idx, row in enumerate(all_data[1:], start=2):
+        if len(row) >= 4 and row[0] and row[3]:
+            try:
+                date_str = row[0]
+                description = row[1]
+                category = row[2]
+                amount = float(row[3])
+            except (ValueError, IndexError):
+                continue
+            
+            try:
+                month_key = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m")
+            except ValueError:
+                month_key = None
+            
+            expenses.append({
+                "id": f"{account}_{idx}",
+                "rowIndex": idx,
+                "date": date_str,
+                "description": description,
+                "category": category,
+                "amount": amount
+            })
+            months.append(month_key)
+    
+    ledger = {
+        "expenses": expenses,
+        "months": months,
+        "loaded_at": time.time()
+    }
+    return ledger
+
+def read_ledger(account: str):
+    """Read and parse the raw sheet, caching the result unless a write happened during the read"""
+    generation = ledger_generations.get(account, 0)
+    ledger = build_ledger(account, get_account_sheet(account).get_all_values())
+    with ledger_lock:
+        if ledger_generations.get(account, 0) == generation:
+            ledger_cache[account] = ledger
+    return ledger
+
+def load_ledger(account: str):
+    """Return the cached ledger for an account, reading the raw sheet only when stale"""
+    ledger = ledger_cache.get(account)
+    if ledger and time.time() - ledger["loaded_at"] < LEDGER_CACHE_TTL:
+        return ledger
+    return read_ledger(account)
+
+def invalidate_ledger(account: str):
+    with ledger_lock:
+        ledger_generations[account] = ledger_generations.get(account, 0) + 1
+        ledger_cache.pop(account, None)
+
+def get_search_index(ledger):
+    """Return the inverted index and sorted vocabulary for a ledger, building them on first use"""
+    if "search_index" not in ledger:
+        postings = defaultdict(list)
+        for position, expense in enumerate(ledger["expenses"]):
+            for token in set(tokenize(expense["description"])):
+                postings[token].append(position)
+        ledger["search_index"] = (dict(postings), sorted(postings))
+    return ledger["search_index"]
+
+def search_ledger(ledger, query: str):
+    """Return positions of expenses whose description has a token starting with every query term"""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    
+    index, tokens = get_search_index(ledger)
+    matches = None
+    for term in set(terms):
+        # Tokens sharing a prefix are contiguous in the sorted vocabulary
+        term_matches = set()
+        i = bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            term_matches.update(index[tokens[i]])
+            i += 1
+        
+        matches = term_matches if matches is None else matches & term_matches
+        if not matches:
+            return []
+    
+    return sorted(matches)
+
+# === Response Formatting ===
+EXPENSE_FIELDS = ["id", "rowIndex", "date", "description", "category", "amount"]
+COMPRESSION_MIN_SIZE = 1024
+
+def parse_fields(raw_fields):
+    """Parse a comma separated `fields=` projection, defaulting to every expense field"""
+    if raw_fields is None:
+        return EXPENSE_FIELDS
+    
+    # Duplicates are dropped, keeping the order fields were first requested in
+    fields = list(dict.fromkeys(field.strip() for field in raw_fields.split(',') if field.strip()))
+    if not fields:
+        raise ValueError("fields must name at least one field")
+    
+    unknown = [field for field in fields if field not in EXPENSE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+def format_expenses(expenses, fields, columnar: bool):
+    """Project expenses onto fields, either as row dicts or as parallel column arrays"""
+    if not columnar:
+        return [{field: expense[field] for field in fields} for expense in expenses]
+    
+    # Categories are sent once and referenced by index in the category column
+    categories = list(CATEGORIES)
+    for expense in expenses:
+        if expense["category"] not in categories:
+            categories.append(expense["category"])
+    codes = {category: code for code, category in enumerate(categories)}
+    
+    columns = {}
+    for field in fields:
+        if field == "category":
+            columns[field] = [codes[expense["category"]] for expense in expenses]
+        else:
+            columns[field] = [expense[field] for expense in expenses]
+    
+    return {
+        "fields": fields,
+        "categories": categories,
+        "columns": columns
+    }
+
+def parse_format_args():
+    """Read the format, fields and totalsOnly query args shared by expense listings"""
+    fmt = request.args.get('format', 'rows')
+    if fmt not in ('rows', 'columnar'):
+        raise ValueError(f"Invalid format: {fmt}")
+    
+    return {
+        "columnar": fmt == 'columnar',
+        "fields": parse_fields(request.args.get('fields')),
+        "totals_only": request.args.get('totalsOnly', '').lower() in ('1', 'true', 'yes')
+    }
+
+def expenses_payload(expenses, options):
+    """Build the `expenses` part of a response according to parsed format args"""
+    if options["totals_only"]:
+        return {}
+    if not options["columnar"] and options["fields"] == EXPENSE_FIELDS:
+        return {"expenses": expenses}
+    return {"expenses": format_expenses(expenses, options["fields"], options["columnar"])}
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses with brotli or gzip when the client accepts it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype != 'application/json'):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    
+    if brotli is not None and request.accept_encodings['br']:
+        response.set_data(brotli.compress(body))
+        response.headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
 
 # === API Routes ===
 @app.route('/api/health', methods=['GET'])
@@ -457,6 +924,38 @@ def health_check():
 def get_accounts():
     return jsonify({"accounts": ACCOUNTS})
 
+@app.route('/api/accounts', methods=['POST'])
+def add_account():
+    """Create a new account with its own raw expenses sheet"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        
+        account = str(data.get('account', '')).strip()
+        
+        if not ACCOUNT_NAME_PATTERN.match(account):
+            return jsonify({"error": "Account name must be 1-40 letters or digits"}), 400
+        
+        try:
+            create_account(account)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        print(f"Created account {account}")
+        
+        return jsonify({
+            "success": True,
+            "message": f"Account {account} created",
+            "accounts": ACCOUNTS
+        })
+        
+    except Exception as e:
+        print(f"Error creating account: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/expenses', methods=['POST'])
 def add_expenses():
     try:
@@ -474,6 +973,7 @@ def add_expenses():
         print(f"Processing {len(expenses)} expenses for {account}")
         print(f"{'='*50}")
         
+        raw_rows = []
         grouped = {}
         for expense in expenses:
             date_str = expense.get('date')
@@ -496,7 +996,7 @@ def add_expenses():
                 return jsonify({"error": f"Invalid date format: {date_str}"}), 400
             
             print(f"Adding to {account} sheet: {date_str} | {description} | {category} | {amount}")
-            account_sheets[account].append_row([date_str, description, category, float(amount), account])
+            raw_rows.append([date_str, description, category, float(amount), account])
             
             date_obj = datetime.strptime(date_str, "%Y-%m-%d")
             year_name = date_obj.strftime("%Y")
@@ -513,19 +1013,21 @@ def add_expenses():
             else:
                 grouped[key]['wants'].append([date_str, description, float(amount)])
         
-        for (year_name, month), data in grouped.items():
-            month_name = datetime(int(year_name), month, 1).strftime("%B")
-            print(f"\nUpdating {month_name} {year_name} for {account}:")
-            print(f"  Income entries: {len(data['income'])}")
-            print(f"  Needs entries: {len(data['needs'])}")
-            print(f"  Wants entries: {len(data['wants'])}")
-            
-            cache_key = f"{account}_{year_name}"
-            if cache_key in year_sheet_cache:
-                del year_sheet_cache[cache_key]
+        # Adjacent years share a chain so a new January can link to the December before it;
+        # separate chains touch different year sheets and are written concurrently
+        year_chains = []
+        for year_name in sorted(set(year_name for year_name, _ in grouped)):
+            if year_chains and int(year_chains[-1][-1]) == int(year_name) - 1:
+                year_chains[-1].append(year_name)
+            else:
+                year_chains.append([year_name])
+        
+        with account_lock(account):
+            # All rows are validated first, then written in a single call
+            get_account_sheet(account).append_rows(raw_rows)
+            invalidate_ledger(account)
             
-            year_sheet = get_year_sheet(year_name, account)
-            append_to_month(year_sheet, month, year_name, account, data['income'], data['needs'], data['wants'])
+            run_concurrently([(append_to_years, account, chain, grouped) for chain in year_chains])
         
         print(f"\n{'='*50}")
         print(f"Successfully processed all expenses for {account}")
@@ -552,11 +1054,17 @@ def get_summary():
         if account not in ACCOUNTS:
             return jsonify({"error": "Invalid account"}), 400
         
-        all_data = account_sheets[account].get_all_values()
+        try:
+            options = parse_format_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Summary always reads the sheet fresh, which also refreshes the cached ledger
+        ledger = read_ledger(account)
         
-        if len(all_data) <= 1:
+        if not ledger["expenses"]:
             return jsonify({
-                "expenses": [], 
+                **expenses_payload([], options),
                 "total": 0,
                 "categoryTotals": {"Income": 0, "Needs": 0, "Wants": 0},
                 "monthlySummary": {},
@@ -564,40 +1072,19 @@ def get_summary():
                 "account": account
             })
         
-        expenses = []
+        expenses = list(ledger["expenses"])
         category_totals = {"Income": 0, "Needs": 0, "Wants": 0}
         monthly_data = defaultdict(lambda: {"Income": 0, "Needs": 0, "Wants": 0})
         
-        for idx, row in enumerate(all_data[1:], start=2):
-            if len(row) >= 4 and row[0] and row[3]:
-                try:
-                    date_str = row[0]
-                    description = row[1]
-                    category = row[2]
-                    amount = float(row[3])
-                    
-                    expense = {
-                        "id": f"{account}_{idx}",
-                        "rowIndex": idx,
-                        "date": date_str,
-                        "description": description,
-                        "category": category,
-                        "amount": amount
-                    }
-                    expenses.append(expense)
-                    
-                    if category in category_totals:
-                        category_totals[category] += amount
-                    
-                    try:
-                        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                        month_key = date_obj.strftime("%Y-%m")
-                        monthly_data[month_key][category] += amount
-                    except:
-                        pass
-                        
-                except (ValueError, IndexError):
-                    continue
+        for expense, month_key in zip(expenses, ledger["months"]):
+            category = expense["category"]
+            amount = expense["amount"]
+            
+            if category in category_totals:
+                category_totals[category] += amount
+            
+            if month_key and category in category_totals:
+                monthly_data[month_key][category] += amount
         
         expenses.sort(key=lambda x: x['date'], reverse=True)
         savings = category_totals["Income"] - category_totals["Needs"] - category_totals["Wants"]
@@ -614,7 +1101,7 @@ def get_summary():
             })
         
         return jsonify({
-            "expenses": expenses,
+            **expenses_payload(expenses, options),
             "total": len(expenses),
             "categoryTotals": category_totals,
             "monthlySummary": monthly_summary,
@@ -628,6 +1115,91 @@ def get_summary():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_expenses():
+    """Search expense descriptions with prefix matching and per-query totals"""
+    try:
+        account = request.args.get('account', 'Kek')
+        query = request.args.get('q', '')
+        
+        if account not in ACCOUNTS:
+            return jsonify({"error": "Invalid account"}), 400
+        
+        if not tokenize(query):
+            return jsonify({"error": "Search query cannot be empty"}), 400
+        
+        try:
+            options = parse_format_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        ledger = load_ledger(account)
+        positions = search_ledger(ledger, query)
+        
+        expenses = []
+        category_totals = {"Income": 0, "Needs": 0, "Wants": 0}
+        monthly_data = defaultdict(lambda: {"Income": 0, "Needs": 0, "Wants": 0})
+        
+        for position in positions:
+            expense = ledger["expenses"][position]
+            month_key = ledger["months"][position]
+            expenses.append(expense)
+            
+            if expense["category"] in category_totals:
+                category_totals[expense["category"]] += expense["amount"]
+                if month_key:
+                    monthly_data[month_key][expense["category"]] += expense["amount"]
+        
+        expenses.sort(key=lambda x: x['date'], reverse=True)
+        
+        monthly_totals = []
+        for month_key in sorted(monthly_data.keys(), reverse=True):
+            data = monthly_data[month_key]
+            monthly_totals.append({
+                "month": month_key,
+                "income": data["Income"],
+                "needs": data["Needs"],
+                "wants": data["Wants"]
+            })
+        
+        return jsonify({
+            **expenses_payload(expenses, options),
+            "total": len(expenses),
+            "categoryTotals": category_totals,
+            "monthlyTotals": monthly_totals,
+            "query": query,
+            "account": account
+        })
+        
+    except Exception as e:
+        print(f"Error in search_expenses: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/balances', methods=['GET'])
+def get_balances():
+    """Get the running monthly balance series, carrying each month's savings forward"""
+    try:
+        account = request.args.get('account', 'Kek')
+        
+        if account not in ACCOUNTS:
+            return jsonify({"error": "Invalid account"}), 400
+        
+        balances = compute_balances(load_ledger(account))
+        
+        return jsonify({
+            "balances": balances,
+            "closing": balances[-1]["closing"] if balances else 0,
+            "account": account
+        })
+        
+    except Exception as e:
+        print(f"Error in get_balances: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/expenses/<expense_id>', methods=['PUT'])
 def update_expense(expense_id):
     """Update an existing expense and rebuild yearly sheets"""
@@ -644,7 +1216,7 @@ def update_expense(expense_id):
         if account not in ACCOUNTS:
             return jsonify({"error": "Invalid account"}), 400
         
-        sheet = account_sheets[account]
+        sheet = get_account_sheet(account)
         
         date_str = data.get('date')
         description = data.get('description')
@@ -665,14 +1237,16 @@ def update_expense(expense_id):
         except:
             return jsonify({"error": f"Invalid date format: {date_str}"}), 400
         
-        # Update the row
-        sheet.update(f'A{row_index}:E{row_index}', 
-                    [[date_str, description, category, float(amount), account]])
-        
-        print(f"Updated expense at row {row_index} in {account} sheet")
-        
-        # Rebuild yearly sheets
-        rebuild_yearly_sheets(account)
+        with account_lock(account):
+            # Update the row
+            sheet.update(f'A{row_index}:E{row_index}', 
+                        [[date_str, description, category, float(amount), account]])
+            
+            print(f"Updated expense at row {row_index} in {account} sheet")
+            invalidate_ledger(account)
+            
+            # Rebuild yearly sheets
+            rebuild_yearly_sheets(account)
         
         return jsonify({
             "success": True,
@@ -699,15 +1273,17 @@ def delete_expense(expense_id):
         if account not in ACCOUNTS:
             return jsonify({"error": "Invalid account"}), 400
         
-        sheet = account_sheets[account]
+        sheet = get_account_sheet(account)
         
-        # Delete the row
-        sheet.delete_rows(row_index)
-        
-        print(f"Deleted expense at row {row_index} from {account} sheet")
-        
-        # Rebuild yearly sheets
-        rebuild_yearly_sheets(account)
+        with account_lock(account):
+            # Delete the row
+            sheet.delete_rows(row_index)
+            
+            print(f"Deleted expense at row {row_index} from {account} sheet")
+            invalidate_ledger(account)
+            
+            # Rebuild yearly sheets
+            rebuild_yearly_sheets(account)
         
         return jsonify({
             "success": True,
@@ -728,7 +1304,8 @@ def rebuild_account_sheets(account):
             return jsonify({"error": "Invalid account"}), 400
         
         print(f"Manual rebuild requested for {account}")
-        rebuild_yearly_sheets(account)
+        with account_lock(account):
+            rebuild_yearly_sheets(account)
         
         return jsonify({
             "success": True,
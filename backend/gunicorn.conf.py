@@ -0,0 +1,13 @@
+# Gunicorn loads this file automatically when started from backend/ (`gunicorn app:app`)
+import os
+
+# Requests spend nearly all their time waiting on the Sheets API, so one process
+# serves many of them at once on threads. The per-account locks, ledger cache and
+# savings-row chain live in memory and are only correct with a single process, so
+# the worker count is pinned and WEB_CONCURRENCY is deliberately ignored
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+
+# Rebuilding every yearly sheet for an account can take a while
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))